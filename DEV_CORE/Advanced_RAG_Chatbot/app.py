@@ -1,10 +1,14 @@
 import streamlit as st
 import os
+import re
+import time
+import uuid
 import pandas as pd
 import plotly.express as px
 from config import Config
 from themes import apply_theme, THEMES
 from chatbot import RAGChatbot
+from chat_history import ChatHistory, purge_expired_sessions
 
 # Force CPU for stability
 os.environ["CUDA_VISIBLE_DEVICES"] = ""
@@ -43,9 +47,37 @@ def load_chatbot(category):
         st.stop()
     return RAGChatbot(category, embeddings=embeddings)
 
+def render_message(message):
+    st.markdown(message["content"])
+    if message["role"] == "assistant" and "confidence" in message:
+        # Show confidence and sources
+        conf = message["confidence"]
+        color = "green" if conf > 70 else "orange" if conf > 40 else "red"
+        st.markdown(f"""
+            <div class='cache-indicator'>{'⚡ Cached Response' if message.get('is_cached') else f'⏱️ Generated in {message.get("response_time", 0):.0f}ms'}</div>
+            <div style='display: flex; align-items: center; gap: 10px;'>
+                <span style='font-size: 0.8rem;'>Confidence: {conf}%</span>
+                <div class='confidence-meter' style='flex-grow: 1; height: 5px;'>
+                    <div class='confidence-fill' style='width: {conf}%; background: {color}; height: 100%;'></div>
+                </div>
+            </div>
+        """, unsafe_allow_html=True)
+        with st.expander("🧠 Verified Neural Nodes"):
+            for source in message.get("sources", []):
+                st.write(f"- {source}")
+
 # Initialize Session State
-if "messages" not in st.session_state:
-    st.session_state.messages = []
+if "session_id" not in st.session_state:
+    # Chat history lives on disk; the session id in the URL lets a refresh resume it.
+    # Anyone with that URL can read the conversation, so treat it as private.
+    purge_expired_sessions()
+    session_id = st.query_params.get("session", "")
+    if not re.fullmatch(r"[0-9a-f]{32}", session_id):
+        session_id = uuid.uuid4().hex
+        st.query_params["session"] = session_id
+    st.session_state.session_id = session_id
+    st.session_state.history = ChatHistory(session_id)
+    st.session_state.history_window = Config.HISTORY_WINDOW
 if "stats" not in st.session_state:
     st.session_state.stats = {
         "queries": 0,
@@ -81,6 +113,8 @@ with col2:
 
 avg_time = (st.session_state.stats["total_time"] / st.session_state.stats["queries"]) if st.session_state.stats["queries"] > 0 else 0
 st.sidebar.metric("Avg Response Time", f"{avg_time:.0f} ms")
+# Filled in after the chat history has been rendered
+render_stats = st.sidebar.empty()
 
 if st.sidebar.button("🗑️ Clear Cache"):
     load_chatbot(category).cache.clear()
@@ -94,31 +128,30 @@ st.sidebar.caption(f"System State: Online")
 st.title(f"🚀 {chatbot_type.upper()}")
 st.markdown(f"**Status:** Neural Link Synchronized | **Systems:** Operational")
 
-# Chat Interface
-for message in st.session_state.messages:
+# Chat Interface (only the most recent window is rendered)
+history = st.session_state.history
+hidden = len(history) - st.session_state.history_window
+if hidden > 0:
+    if st.button(f"⬆️ Load earlier messages ({hidden} hidden)"):
+        st.session_state.history_window += Config.HISTORY_PAGE_SIZE
+        st.rerun()
+
+render_start = time.perf_counter()
+visible_messages = history.tail(st.session_state.history_window)
+for message in visible_messages:
     with st.chat_message(message["role"]):
-        st.markdown(message["content"])
-        if message["role"] == "assistant" and "confidence" in message:
-            # Show confidence and sources
-            conf = message["confidence"]
-            color = "green" if conf > 70 else "orange" if conf > 40 else "red"
-            st.markdown(f"""
-                <div class='cache-indicator'>{'⚡ Cached Response' if message.get('is_cached') else f'⏱️ Generated in {message.get("response_time", 0):.0f}ms'}</div>
-                <div style='display: flex; align-items: center; gap: 10px;'>
-                    <span style='font-size: 0.8rem;'>Confidence: {conf}%</span>
-                    <div class='confidence-meter' style='flex-grow: 1; height: 5px;'>
-                        <div class='confidence-fill' style='width: {conf}%; background: {color}; height: 100%;'></div>
-                    </div>
-                </div>
-            """, unsafe_allow_html=True)
-            with st.expander("🧠 Verified Neural Nodes"):
-                for source in message.get("sources", []):
-                    st.write(f"- {source}")
+        render_message(message)
+render_time = (time.perf_counter() - render_start) * 1000
+render_stats.metric(
+    "History Render",
+    f"{render_time:.1f} ms",
+    help=f"{len(visible_messages)} of {len(history)} messages rendered"
+)
 
 # User Input
 if prompt := st.chat_input("Query the Unified Intelligence Core..."):
     # Add user message to history
-    st.session_state.messages.append({"role": "user", "content": prompt})
+    history.append({"role": "user", "content": prompt})
     with st.chat_message("user"):
         st.markdown(prompt)
 
@@ -134,27 +167,6 @@ if prompt := st.chat_input("Query the Unified Intelligence Core..."):
             if result["is_cached"]:
                 st.session_state.stats["cache_hits"] += 1
             
-            # Display
-            st.markdown(result["answer"])
-            
-            # Confidence UI
-            conf = result["confidence"]
-            color = "green" if conf > 70 else "orange" if conf > 40 else "red"
-            st.markdown(f"""
-                <div class='cache-indicator'>{'⚡ Cached Response' if result['is_cached'] else f'⏱️ Generated in {result["response_time"]:.0f}ms'}</div>
-                <div style='display: flex; align-items: center; gap: 10px;'>
-                    <span style='font-size: 0.8rem;'>Confidence: {conf}%</span>
-                    <div class='confidence-meter' style='flex-grow: 1; height: 5px;'>
-                        <div class='confidence-fill' style='width: {conf}%; background: {color}; height: 100%;'></div>
-                    </div>
-                </div>
-            """, unsafe_allow_html=True)
-            
-            with st.expander("🧠 Verified Neural Nodes"):
-                for source in result["sources"]:
-                    st.write(f"- {source}")
-            
-            # Add to history
             assistant_message = {
                 "role": "assistant", 
                 "content": result["answer"],
@@ -163,7 +175,12 @@ if prompt := st.chat_input("Query the Unified Intelligence Core..."):
                 "is_cached": result["is_cached"],
                 "response_time": result["response_time"]
             }
-            st.session_state.messages.append(assistant_message)
+            
+            # Display
+            render_message(assistant_message)
+            
+            # Add to history
+            history.append(assistant_message)
 
 # Footer
 st.markdown("---")
@@ -0,0 +1,144 @@
+import os
+import sys
+import json
+import time
+import argparse
+import tracemalloc
+import numpy as np
+from config import Config
+from vector_codec import VECTOR_DTYPES, CompactVectors, compact_faiss_index, faiss_index_dtype, faiss_index_nbytes
+from warm_cache import load_query_log, rank_queries
+
+
+def _fmt_bytes(n):
+    for unit in ["B", "KB", "MB", "GB"]:
+        if n < 1024:
+            return f"{n:.1f} {unit}"
+        n /= 1024
+    return f"{n:.1f} TB"
+
+
+def _python_list_nbytes(vectors):
+    # What the old cache held in memory: one list of Python floats per entry
+    if not len(vectors):
+        return 0
+    row = vectors[0].tolist()
+    per_row = sys.getsizeof(row) + sum(sys.getsizeof(x) for x in row)
+    return per_row * len(vectors)
+
+
+def load_queries(category, limit):
+    queries = [query for query, _ in rank_queries(load_query_log(Config.query_log_file(category)))][:limit]
+    if not queries:
+        return None
+
+    try:
+        from langchain_huggingface import HuggingFaceEmbeddings
+    except ImportError:
+        from langchain_community.embeddings import HuggingFaceEmbeddings
+
+    print(f"Embedding {len(queries)} logged queries with {Config.FREE_EMBEDDING_MODEL}")
+    embeddings = HuggingFaceEmbeddings(
+        model_name=Config.FREE_EMBEDDING_MODEL,
+        model_kwargs={'device': 'cpu'}
+    )
+    return np.asarray(embeddings.embed_documents(queries), dtype=np.float32)
+
+
+def benchmark_index(category, queries, k, sample):
+    import faiss
+
+    index_file = os.path.join(Config.VECTOR_DB_DIR, category, "index.faiss")
+    if not os.path.exists(index_file):
+        print(f"FAISS index {index_file} not found. Run ingest_pdfs.py first.")
+        return
+
+    index = faiss.read_index(index_file)
+    if not isinstance(index, faiss.IndexFlat):
+        print(f"Warning: Stored index is {faiss_index_dtype(index)}; the float32 baseline is rebuilt from decoded vectors.")
+    vectors = index.reconstruct_n(0, index.ntotal)
+    flat = faiss.IndexFlatL2(index.d)
+    flat.add(vectors)
+
+    if queries is None:
+        # No query log yet: probe with stored chunk vectors instead
+        rng = np.random.default_rng(0)
+        queries = vectors[rng.choice(len(vectors), size=min(sample, len(vectors)), replace=False)]
+    queries = np.ascontiguousarray(queries, dtype=np.float32)
+
+    _, reference = flat.search(queries, k)
+    base_bytes = faiss_index_nbytes(flat)
+
+    print(f"\nFAISS index ({flat.ntotal} vectors, dim {flat.d}, {len(queries)} queries, recall@{k} vs float32)")
+    print(f"{'dtype':<8} {'memory':>10} {'saved':>8} {'recall':>8}")
+    for dtype in VECTOR_DTYPES:
+        compact = compact_faiss_index(flat, dtype)
+        _, found = compact.search(queries, k)
+        recall = np.mean([len(set(a) & set(b)) / k for a, b in zip(reference, found)])
+        nbytes = faiss_index_nbytes(compact)
+        print(f"{dtype:<8} {_fmt_bytes(nbytes):>10} {(1 - nbytes / base_bytes) * 100:>7.1f}% {recall:>8.3f}")
+
+
+def benchmark_cache(category, queries, threshold):
+    cache_file = os.path.join(Config.CACHE_DIR, f"{category}_cache.json")
+    if not os.path.exists(cache_file):
+        print(f"\nSemantic cache {cache_file} not found. Skipping cache benchmark.")
+        return
+
+    with open(cache_file, 'r') as f:
+        entries = json.load(f)
+    if not entries:
+        print("\nSemantic cache is empty. Skipping cache benchmark.")
+        return
+    vectors = np.vstack([CompactVectors.decode(entry['embedding']) for entry in entries])
+
+    # No query log yet: probe with each cached entry against all the others
+    leave_one_out = queries is None
+    if leave_one_out:
+        queries = vectors
+
+    def replay(store):
+        # Returns hit decisions, ms per query and peak transient bytes per lookup
+        hits = []
+        tracemalloc.start()
+        start = time.perf_counter()
+        for i, q in enumerate(queries):
+            similarities = store.similarities(q)
+            if leave_one_out:
+                similarities[i] = -1
+            hits.append(similarities.max() >= threshold)
+            del similarities
+        latency = (time.perf_counter() - start) / len(queries) * 1000
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return np.array(hits), latency, peak
+
+    reference = CompactVectors("float32")
+    reference.extend(vectors)
+    reference_hits, _, _ = replay(reference)
+    legacy_disk = sum(len(json.dumps(v.tolist())) for v in vectors)
+    legacy_memory = _python_list_nbytes(vectors)
+
+    print(f"\nSemantic cache ({len(vectors)} entries, {len(queries)} queries, threshold {threshold})")
+    print(f"JSON float lists: {_fmt_bytes(legacy_disk)} on disk, ~{_fmt_bytes(legacy_memory)} as Python objects")
+    print(f"{'dtype':<8} {'disk':>10} {'memory':>10} {'peak/query':>11} {'ms/query':>9} {'hit rate':>9} {'agree':>7}")
+    for dtype in VECTOR_DTYPES:
+        store = CompactVectors(dtype)
+        store.extend(vectors)
+        hits, latency, peak = replay(store)
+        disk = sum(len(json.dumps(store.encode(i))) for i in range(len(store)))
+        print(f"{dtype:<8} {_fmt_bytes(disk):>10} {_fmt_bytes(store.nbytes):>10} {_fmt_bytes(peak):>11} "
+              f"{latency:>9.2f} {hits.mean() * 100:>8.1f}% {(hits == reference_hits).mean() * 100:>6.1f}%")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare float32, float16 and int8 vector storage.")
+    parser.add_argument("--category", default="unified")
+    parser.add_argument("--k", type=int, default=Config.RETRIEVAL_TOP_K)
+    parser.add_argument("--queries", type=int, default=200, help="Max queries taken from the query log (or sampled)")
+    parser.add_argument("--threshold", type=float, default=Config.CACHE_SIMILARITY_THRESHOLD)
+    args = parser.parse_args()
+
+    queries = load_queries(args.category, args.queries)
+    benchmark_index(args.category, queries, args.k, args.queries)
+    benchmark_cache(args.category, queries, args.threshold)
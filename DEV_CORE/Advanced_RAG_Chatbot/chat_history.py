@@ -0,0 +1,95 @@
+import os
+import json
+import time
+from config import Config
+
+class ChatHistory:
+    # Append-only JSONL store for one chat session. Only the byte offset of
+    # each message is kept in memory, so any window of turns can be read back
+    # without loading the whole session. Several browser tabs may share one
+    # session file, so the index is extended whenever the file has grown.
+    # The session id (carried in the app URL as ?session=...) is the only key
+    # to the file: anyone holding it can read the conversation.
+    def __init__(self, session_id):
+        self.session_id = session_id
+        self.history_file = os.path.join(Config.HISTORY_DIR, f"{session_id}.jsonl")
+        self.offsets = []
+        self._end = 0
+        self._refresh()
+
+        # Drop a partial trailing line left by an interrupted write
+        if os.path.exists(self.history_file) and self._end < os.path.getsize(self.history_file):
+            with open(self.history_file, 'r+b') as f:
+                f.truncate(self._end)
+
+    def _refresh(self):
+        try:
+            size = os.path.getsize(self.history_file)
+        except OSError:
+            size = 0
+        if size == self._end:
+            return
+        if size < self._end:
+            # File was purged or truncated: rebuild from scratch
+            self.offsets = []
+            self._end = 0
+            if not size:
+                return
+
+        offset = self._end
+        with open(self.history_file, 'rb') as f:
+            f.seek(offset)
+            for line in f:
+                # Stop at a line another writer hasn't finished yet
+                if not line.endswith(b"\n"):
+                    break
+                self.offsets.append(offset)
+                offset += len(line)
+        self._end = offset
+
+    def __len__(self):
+        self._refresh()
+        return len(self.offsets)
+
+    def append(self, message):
+        line = (json.dumps(message, separators=(',', ':')) + "\n").encode('utf-8')
+        with open(self.history_file, 'ab') as f:
+            f.write(line)
+        self._refresh()
+
+    def read(self, start, end=None):
+        self._refresh()
+        start = max(0, start)
+        end = len(self) if end is None else min(end, len(self))
+        if start >= end:
+            return []
+
+        messages = []
+        with open(self.history_file, 'rb') as f:
+            f.seek(self.offsets[start])
+            for _ in range(end - start):
+                messages.append(json.loads(f.readline()))
+        return messages
+
+    def tail(self, n):
+        return self.read(len(self) - n)
+
+
+def purge_expired_sessions(retention_days=Config.HISTORY_RETENTION_DAYS):
+    # Delete session files not written to within the retention period
+    if retention_days <= 0 or not os.path.isdir(Config.HISTORY_DIR):
+        return 0
+
+    cutoff = time.time() - retention_days * 86400
+    removed = 0
+    for filename in os.listdir(Config.HISTORY_DIR):
+        if not filename.endswith(".jsonl"):
+            continue
+        path = os.path.join(Config.HISTORY_DIR, filename)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                removed += 1
+        except OSError:
+            pass
+    return removed
@@ -1,5 +1,7 @@
 import os
+import json
 import time
+import tempfile
 from langchain_groq import ChatGroq
 from langchain_community.vectorstores import FAISS
 try:
@@ -9,10 +11,46 @@ except ImportError:
 from langchain_core.prompts import PromptTemplate
 from config import Config
 from semantic_cache import SemanticCache
+from vector_codec import compact_faiss_index
+
+def prune_query_log(log_file, retention_days=Config.QUERY_LOG_RETENTION_DAYS):
+    # Drop query log records older than the retention period. Runs once when a
+    # chatbot is created; appends from other processes during the rewrite can be lost.
+    if retention_days <= 0 or not os.path.exists(log_file):
+        return 0
+
+    cutoff = time.time() - retention_days * 86400
+    kept = []
+    dropped = 0
+    with open(log_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+                timestamp = float(record.get("timestamp", 0))
+            except (ValueError, TypeError, AttributeError):
+                timestamp = 0
+            if timestamp >= cutoff:
+                kept.append(line)
+            else:
+                dropped += 1
+
+    if dropped:
+        fd, tmp_file = tempfile.mkstemp(dir=os.path.dirname(log_file), suffix=".tmp")
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.writelines(kept)
+        os.replace(tmp_file, log_file)
+    return dropped
 
 class RAGChatbot:
-    def __init__(self, category, embeddings=None):
+    def __init__(self, category, embeddings=None, log_queries=Config.LOG_QUERIES):
         self.category = category
+        self.log_queries = log_queries
+        self.query_log_file = Config.query_log_file(category)
+        if self.log_queries:
+            try:
+                prune_query_log(self.query_log_file)
+            except OSError as e:
+                print(f"Query log prune failed: {e}")
         if embeddings:
             self.embeddings = embeddings
         else:
@@ -30,6 +68,8 @@ class RAGChatbot:
                 self.embeddings, 
                 allow_dangerous_deserialization=True
             )
+            # No-op if the index was already compacted at ingest time
+            self.vector_db.index = compact_faiss_index(self.vector_db.index, Config.VECTOR_DTYPE)
         else:
             self.vector_db = None
             
@@ -60,6 +100,28 @@ class RAGChatbot:
         """
         
     def query(self, user_input):
+        result = self._query(user_input)
+        self._log_query(user_input, result)
+        return result
+
+    def _log_query(self, user_input, result):
+        # Append-only JSONL record, replayed by warm_cache.py
+        if not self.log_queries:
+            return
+        record = {
+            "timestamp": time.time(),
+            "category": self.category,
+            "query": user_input,
+            "is_cached": result.get("is_cached", False),
+            "response_time": result.get("response_time", 0)
+        }
+        try:
+            with open(self.query_log_file, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record) + "\n")
+        except OSError as e:
+            print(f"Query log write failed: {e}")
+
+    def _query(self, user_input):
         if self.category == "mern":
             return self.mern_query(user_input)
             
@@ -122,12 +184,14 @@ class RAGChatbot:
             question=user_input
         )
         
+        llm_ok = True
         try:
             response = self.llm.invoke(prompt)
             answer = response.content
         except Exception as e:
             answer = f"Neural Link Interrupted: {str(e)}"
             confidence = 0
+            llm_ok = False
         
         # 5. Extract Sources
         sources = list(set([os.path.basename(doc.metadata.get('source', 'Unknown')) for doc in docs]))
@@ -140,8 +204,9 @@ class RAGChatbot:
             "response_time": (time.time() - start_time) * 1000
         }
         
-        # 6. Save to Cache (store text + vector)
-        self.cache.set(user_input, query_embedding, result)
+        # 6. Save to Cache (store text + vector), never cache a failed generation
+        if llm_ok:
+            self.cache.set(user_input, query_embedding, result)
         
         return result
 
@@ -24,7 +24,29 @@ class Config:
     # LLM Parameters
     LLM_TEMPERATURE = float(os.getenv("LLM_TEMPERATURE", 0.0))
     MAX_TOKENS = int(os.getenv("MAX_TOKENS", 600))
-    
+
+    # Semantic Cache
+    CACHE_SIMILARITY_THRESHOLD = float(os.getenv("CACHE_SIMILARITY_THRESHOLD", 0.85))
+
+    # Vector Storage: "float32", "float16" or "int8" (cache and FAISS index)
+    # int8 is the smallest and scores as fast as float32. float16 halves memory
+    # but cache lookups run ~4x slower than float32 (numpy decodes float16 slowly).
+    VECTOR_DTYPE = os.getenv("VECTOR_DTYPE", "float32").lower()
+
+    # Chat History (counted in messages, not turns)
+    # The ?session= id in the app URL is the only key to a saved conversation.
+    HISTORY_WINDOW = int(os.getenv("HISTORY_WINDOW", 20))
+    HISTORY_PAGE_SIZE = int(os.getenv("HISTORY_PAGE_SIZE", 20))
+    HISTORY_RETENTION_DAYS = int(os.getenv("HISTORY_RETENTION_DAYS", 7))  # 0 keeps sessions forever
+
+    # Query Log & Cache Warm-up
+    # Every prompt is kept in logs/<category>_queries.jsonl for QUERY_LOG_RETENTION_DAYS
+    LOG_QUERIES = os.getenv("LOG_QUERIES", "True").lower() == "true"
+    QUERY_LOG_RETENTION_DAYS = int(os.getenv("QUERY_LOG_RETENTION_DAYS", 7))  # 0 keeps the log forever
+    WARMUP_TOP_N = int(os.getenv("WARMUP_TOP_N", 50))
+    WARMUP_CLUSTER_THRESHOLD = float(os.getenv("WARMUP_CLUSTER_THRESHOLD", 0.85))
+    WARMUP_REQUESTS_PER_MINUTE = float(os.getenv("WARMUP_REQUESTS_PER_MINUTE", 20))
+
     # Paths
     BASE_DIR = os.path.dirname(os.path.abspath(__file__))
     PDF_DIR = os.path.join(BASE_DIR, "pdfs")
@@ -32,11 +54,16 @@ class Config:
     DATA_DIR = os.path.join(BASE_DIR, "data")
     CACHE_DIR = os.path.join(BASE_DIR, "cache")
     LOG_DIR = os.path.join(BASE_DIR, "logs")
+    HISTORY_DIR = os.path.join(DATA_DIR, "sessions")
     
+    @classmethod
+    def query_log_file(cls, category):
+        return os.path.join(cls.LOG_DIR, f"{category}_queries.jsonl")
+
     # Ensure directories exist
     @classmethod
     def ensure_dirs(cls):
-        for d in [cls.PDF_DIR, cls.VECTOR_DB_DIR, cls.DATA_DIR, cls.CACHE_DIR, cls.LOG_DIR]:
+        for d in [cls.PDF_DIR, cls.VECTOR_DB_DIR, cls.DATA_DIR, cls.CACHE_DIR, cls.LOG_DIR, cls.HISTORY_DIR]:
             os.makedirs(d, exist_ok=True)
             # Create subdirs for categories
             if d in [cls.PDF_DIR, cls.VECTOR_DB_DIR]:
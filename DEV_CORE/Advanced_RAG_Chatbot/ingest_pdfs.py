@@ -1,6 +1,7 @@
 import os
 import shutil
 from config import Config
+from vector_codec import compact_faiss_index
 
 
 
@@ -88,6 +89,7 @@ def process_pdfs():
         # Create Vector Store
         print(f"Creating vector store for {category} ({len(splits)} chunks)...")
         vector_store = FAISS.from_documents(splits, embeddings)
+        vector_store.index = compact_faiss_index(vector_store.index, Config.VECTOR_DTYPE)
         
         # Save Vector Store
         save_path = os.path.join(Config.VECTOR_DB_DIR, category)
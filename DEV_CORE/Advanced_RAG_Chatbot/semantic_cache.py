@@ -1,73 +1,138 @@
 import os
 import json
+import tempfile
+import threading
+from contextlib import contextmanager
 import numpy as np
+try:
+    import fcntl
+except ImportError:
+    # Windows
+    fcntl = None
+    import msvcrt
 try:
     from langchain_huggingface import HuggingFaceEmbeddings
 except ImportError:
     from langchain_community.embeddings import HuggingFaceEmbeddings
 from config import Config
+from vector_codec import CompactVectors
 
+# The cache file may be written by more than one process (the Streamlit app
+# and warm_cache.py). Every instance reloads the file when its mtime changes.
+# Writers hold an OS file lock across reload, append and atomic replace, so
+# entries added by another process are merged instead of being overwritten.
 class SemanticCache:
     def __init__(self, category):
         self.category = category
         self.cache_file = os.path.join(Config.CACHE_DIR, f"{category}_cache.json")
-        self.cache_data = self._load()
-        
+        self.lock_file = f"{self.cache_file}.lock"
+        # Entries hold query/response only; embeddings live in a compact matrix
+        self.vectors = CompactVectors(Config.VECTOR_DTYPE)
+        self.cache_data = []
+        self._file_stamp = None
+        # cache_data and vectors are parallel (row i of vectors belongs to
+        # entry i), and one instance is shared by every Streamlit session,
+        # so all reads and writes of the pair happen under this lock
+        self._lock = threading.RLock()
+        self._load()
+
+    def _stamp(self):
+        try:
+            stat = os.stat(self.cache_file)
+            return stat.st_mtime_ns, stat.st_size
+        except OSError:
+            return None
+
     def _load(self):
-        if os.path.exists(self.cache_file):
+        stamp = self._stamp()
+        if stamp is None:
+            self._file_stamp = None
+            return
+        try:
+            with open(self.cache_file, 'r') as f:
+                entries = json.load(f)
+            # Legacy float lists and other dtypes are re-encoded on load
+            embeddings = [CompactVectors.decode(entry.pop('embedding')) for entry in entries]
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            # Keep what is already in memory rather than starting from empty
+            print(f"Cache load failed for {self.cache_file}: {e}")
+            self._file_stamp = stamp
+            return
+
+        vectors = CompactVectors(Config.VECTOR_DTYPE)
+        if embeddings:
+            vectors.extend(np.vstack(embeddings))
+        with self._lock:
+            self.vectors, self.cache_data, self._file_stamp = vectors, entries, stamp
+
+    @contextmanager
+    def _file_lock(self):
+        # Blocks until no other process is writing the cache file
+        with open(self.lock_file, 'a+b') as f:
+            if fcntl:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
             try:
-                with open(self.cache_file, 'r') as f:
-                    return json.load(f)
-            except:
-                return []
-        return []
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def _refresh(self):
+        if self._stamp() != self._file_stamp:
+            self._load()
 
     def _save(self):
-        with open(self.cache_file, 'w') as f:
-            json.dump(self.cache_data, f)
+        entries = [dict(entry, embedding=self.vectors.encode(i)) for i, entry in enumerate(self.cache_data)]
+        fd, tmp_file = tempfile.mkstemp(dir=Config.CACHE_DIR, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(entries, f)
+            os.replace(tmp_file, self.cache_file)
+        except BaseException:
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
+            raise
+        self._file_stamp = self._stamp()
+
+    def best_match(self, query_embedding):
+        # Returns (entry, similarity) of the closest cached entry, or (None, -1)
+        with self._lock:
+            self._refresh()
+            if not self.cache_data:
+                return None, -1
+
+            # Cosine similarity against every cached vector in one pass
+            similarities = self.vectors.similarities(query_embedding)
+            best = int(np.argmax(similarities))
+            return self.cache_data[best], float(similarities[best])
+
+    def get(self, query_embedding, threshold=Config.CACHE_SIMILARITY_THRESHOLD):
+        best_match, max_similarity = self.best_match(query_embedding)
 
-    def get(self, query_embedding, threshold=0.85):
-        if not self.cache_data:
-            return None
-            
-        # Ensure query_embedding is numpy array
-        if not isinstance(query_embedding, np.ndarray):
-            query_embedding = np.array(query_embedding)
-        
-        best_match = None
-        max_similarity = -1
-        
-        for entry in self.cache_data:
-            # Entry embedding is list from JSON
-            cached_embedding = np.array(entry['embedding'])
-            
-            # Cosine similarity
-            similarity = np.dot(query_embedding, cached_embedding) / (
-                np.linalg.norm(query_embedding) * np.linalg.norm(cached_embedding)
-            )
-            
-            if similarity > max_similarity:
-                max_similarity = similarity
-                best_match = entry
-        
         if max_similarity >= threshold:
             print(f"Cache hit! Similarity: {max_similarity:.2f}")
             return best_match['response']
-        
+
         return None
 
     def set(self, query, embedding, response):
-        # Store embedding as list for JSON serialization
-        if isinstance(embedding, np.ndarray):
-            embedding = embedding.tolist()
-            
-        self.cache_data.append({
-            'query': query,
-            'response': response,
-            'embedding': embedding
-        })
-        self._save()
+        with self._lock, self._file_lock():
+            self._refresh()
+            self.vectors.extend(embedding)
+            self.cache_data.append({
+                'query': query,
+                'response': response
+            })
+            self._save()
 
     def clear(self):
-        self.cache_data = []
-        self._save()
+        with self._lock, self._file_lock():
+            self.cache_data = []
+            self.vectors = CompactVectors(Config.VECTOR_DTYPE)
+            self._save()
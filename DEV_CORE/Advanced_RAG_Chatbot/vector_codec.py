@@ -0,0 +1,172 @@
+import base64
+import numpy as np
+from config import Config
+
+VECTOR_DTYPES = ("float32", "float16", "int8")
+
+# Rows upcast to float32 at a time when scoring compact vectors. Bounds the
+# transient copy to SIMILARITY_BLOCK_ROWS * dim * 4 bytes (1.5 MB at dim 384).
+SIMILARITY_BLOCK_ROWS = 1024
+
+
+# Row-normalized embedding matrix kept in float32, float16 or int8.
+# int8 uses symmetric per-vector scalar quantization (codes + one float32 scale
+# per row). Similarity is computed block by block over the stored codes, so the
+# matrix is never expanded back to float32 as a whole.
+class CompactVectors:
+    def __init__(self, dtype=Config.VECTOR_DTYPE):
+        if dtype not in VECTOR_DTYPES:
+            raise ValueError(f"Unsupported vector dtype '{dtype}'. Use one of {VECTOR_DTYPES}.")
+        self.dtype = dtype
+        # Rows live in over-allocated buffers that double when full, so single
+        # inserts are amortized O(1) instead of copying the matrix each time
+        self._codes = None
+        self._scales = None
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def codes(self):
+        return None if self._codes is None else self._codes[:self._size]
+
+    @property
+    def scales(self):
+        return None if self._scales is None else self._scales[:self._size]
+
+    @property
+    def nbytes(self):
+        # Allocated size, including spare capacity
+        if self._codes is None:
+            return 0
+        return self._codes.nbytes + (self._scales.nbytes if self._scales is not None else 0)
+
+    def quantize(self, vectors):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim == 1:
+            vectors = vectors[None, :]
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        vectors = vectors / norms
+
+        if self.dtype == "float32":
+            return vectors, None
+        if self.dtype == "float16":
+            return vectors.astype(np.float16), None
+
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        codes = np.round(vectors / scales[:, None]).astype(np.int8)
+        return codes, scales.astype(np.float32)
+
+    def extend(self, vectors):
+        codes, scales = self.quantize(vectors)
+        size = self._size + len(codes)
+
+        if self._codes is None or size > len(self._codes):
+            capacity = max(size, 2 * (0 if self._codes is None else len(self._codes)), 16)
+            grown = np.empty((capacity, codes.shape[1]), dtype=codes.dtype)
+            grown_scales = np.empty(capacity, dtype=np.float32) if scales is not None else None
+            if self._size:
+                grown[:self._size] = self.codes
+                if grown_scales is not None:
+                    grown_scales[:self._size] = self.scales
+            self._codes, self._scales = grown, grown_scales
+
+        self._codes[self._size:size] = codes
+        if scales is not None:
+            self._scales[self._size:size] = scales
+        self._size = size
+
+    def similarities(self, query):
+        # Cosine similarity of the query against every stored row
+        if not self._size:
+            return np.empty(0, dtype=np.float32)
+        q_codes, q_scales = self.quantize(query)
+        q = q_codes[0].astype(np.float32)
+
+        if self.dtype == "float32":
+            return self.codes @ q
+
+        # Upcast one block at a time and let BLAS do the float32 matvec. For
+        # int8, products of codes are summed exactly in float32 (|sum| < 2**24).
+        out = np.empty(len(self), dtype=np.float32)
+        for start in range(0, len(self), SIMILARITY_BLOCK_ROWS):
+            block = self.codes[start:start + SIMILARITY_BLOCK_ROWS]
+            np.matmul(block.astype(np.float32), q, out=out[start:start + len(block)])
+
+        if self.dtype == "int8":
+            out *= self.scales
+            out *= q_scales[0]
+        return out
+
+    def clear(self):
+        self._codes = None
+        self._scales = None
+        self._size = 0
+
+    # JSON serialization: one base64 blob per row instead of a list of floats
+    def encode(self, i):
+        record = {
+            "dtype": self.dtype,
+            "data": base64.b64encode(self.codes[i].tobytes()).decode("ascii")
+        }
+        if self.scales is not None:
+            record["scale"] = float(self.scales[i])
+        return record
+
+    @staticmethod
+    def decode(record):
+        # Accepts an encoded row or a legacy list of floats; returns float32
+        if isinstance(record, list):
+            return np.asarray(record, dtype=np.float32)
+        codes = np.frombuffer(base64.b64decode(record["data"]), dtype=np.dtype(record["dtype"]))
+        return codes.astype(np.float32) * record.get("scale", 1.0)
+
+
+def compact_faiss_index(index, dtype=Config.VECTOR_DTYPE):
+    # Swap a flat FAISS index for a scalar-quantized one with the same metric,
+    # so L2 distances (and the confidence scoring built on them) keep their meaning.
+    if dtype not in VECTOR_DTYPES:
+        raise ValueError(f"Unsupported vector dtype '{dtype}'. Use one of {VECTOR_DTYPES}.")
+
+    import faiss
+    if not isinstance(index, faiss.IndexFlat):
+        # A compact index can't be converted back without loss
+        stored = faiss_index_dtype(index)
+        if stored != dtype:
+            print(f"Warning: FAISS index is stored as {stored} but VECTOR_DTYPE is {dtype}. "
+                  "Re-run ingest_pdfs.py to rebuild it.")
+        return index
+    if dtype == "float32":
+        return index
+
+    qtype = faiss.ScalarQuantizer.QT_fp16 if dtype == "float16" else faiss.ScalarQuantizer.QT_8bit
+    compact = faiss.IndexScalarQuantizer(index.d, qtype, index.metric_type)
+    if index.ntotal:
+        vectors = index.reconstruct_n(0, index.ntotal)
+        compact.train(vectors)
+        compact.add(vectors)
+    return compact
+
+
+def faiss_index_dtype(index):
+    import faiss
+    if isinstance(index, faiss.IndexFlat):
+        return "float32"
+    if isinstance(index, faiss.IndexScalarQuantizer):
+        qtype = index.sq.qtype
+        if qtype == faiss.ScalarQuantizer.QT_fp16:
+            return "float16"
+        if qtype == faiss.ScalarQuantizer.QT_8bit:
+            return "int8"
+    return type(index).__name__
+
+
+def faiss_index_nbytes(index):
+    # Size of the stored codes, ignoring small fixed overheads
+    import faiss
+    if isinstance(index, faiss.IndexScalarQuantizer):
+        return index.ntotal * index.code_size
+    return index.ntotal * index.d * 4
@@ -0,0 +1,222 @@
+# Pre-warms the semantic cache from a recorded query log. Safe to run while
+# the app is up: SemanticCache writes under a file lock and reloads the cache
+# file when another process changes it.
+import os
+import json
+import time
+import argparse
+from collections import Counter
+import numpy as np
+from config import Config
+
+
+def load_query_log(log_file, since=None):
+    # Read a JSONL query log, skipping blank or corrupt lines and, when since
+    # is given, records logged before that Unix timestamp
+    queries = []
+    if not os.path.exists(log_file):
+        print(f"Warning: Query log {log_file} not found.")
+        return queries
+
+    with open(log_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if not isinstance(record, dict):
+                continue
+            if since is not None:
+                timestamp = record.get("timestamp")
+                if not isinstance(timestamp, (int, float)) or timestamp < since:
+                    continue
+            query = record.get("query")
+            if isinstance(query, str) and query.strip():
+                queries.append(query)
+    return queries
+
+
+def normalize_query(query):
+    return " ".join(query.lower().split())
+
+
+def rank_queries(queries):
+    # Frequency of each normalized query, most common first.
+    # The first spelling seen is kept as the representative text.
+    counts = Counter()
+    originals = {}
+    for query in queries:
+        key = normalize_query(query)
+        counts[key] += 1
+        originals.setdefault(key, query.strip())
+    return [(originals[key], count) for key, count in counts.most_common()]
+
+
+def _normalize_rows(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def embed_queries(ranked, embeddings):
+    return _normalize_rows(embeddings.embed_documents([query for query, _ in ranked]))
+
+
+def cluster_queries(ranked, vectors, threshold=Config.WARMUP_CLUSTER_THRESHOLD):
+    # Greedy leader clustering: walk queries from most to least frequent and
+    # attach each one to the closest cluster leader if it is similar enough.
+    clusters = []
+    # Leaders are written into a preallocated matrix so each step scores a view
+    leader_vectors = np.empty((len(ranked), vectors.shape[1]), dtype=np.float32) if len(ranked) else None
+    for (query, count), vector in zip(ranked, vectors):
+        if clusters:
+            similarities = leader_vectors[:len(clusters)] @ vector
+            best = int(np.argmax(similarities))
+            if similarities[best] >= threshold:
+                clusters[best]["members"].append(query)
+                clusters[best]["count"] += count
+                continue
+
+        leader_vectors[len(clusters)] = vector
+        clusters.append({
+            "query": query,
+            "embedding": vector,
+            "members": [query],
+            "count": count
+        })
+
+    clusters.sort(key=lambda c: c["count"], reverse=True)
+    return clusters
+
+
+def estimate_hit_rate(ranked, vectors, cache, clusters, threshold=Config.CACHE_SIMILARITY_THRESHOLD):
+    # Replay the logged traffic against the cache as it is now, and again with
+    # the selected cluster leaders added, to estimate the hit-rate gain.
+    total = sum(count for _, count in ranked)
+    if not total:
+        return 0.0, 0.0
+
+    warm_vectors = _normalize_rows([c["embedding"] for c in clusters]) if clusters else None
+
+    hits_before = 0
+    hits_after = 0
+    for (_, count), vector in zip(ranked, vectors):
+        _, similarity = cache.best_match(vector)
+        if similarity >= threshold:
+            hits_before += count
+            hits_after += count
+        elif warm_vectors is not None and float(np.max(warm_vectors @ vector)) >= threshold:
+            hits_after += count
+
+    return hits_before / total * 100, hits_after / total * 100
+
+
+def warm_cache(category="unified", log_file=None, top_n=Config.WARMUP_TOP_N,
+               requests_per_minute=Config.WARMUP_REQUESTS_PER_MINUTE, dry_run=False,
+               days=Config.QUERY_LOG_RETENTION_DAYS):
+    print(f"Cache warm-up started for {category}.")
+    if category == "mern":
+        print("The MERN core has no semantic cache. Nothing to warm.")
+        return
+
+    log_file = log_file or Config.query_log_file(category)
+    since = time.time() - days * 86400 if days > 0 else None
+    queries = load_query_log(log_file, since=since)
+    if not queries:
+        print("No logged queries to replay.")
+        return
+
+    ranked = rank_queries(queries)
+    print(f"Loaded {len(queries)} queries ({len(ranked)} distinct) from {log_file}")
+
+    print("Importing LangChain components...")
+    try:
+        from langchain_huggingface import HuggingFaceEmbeddings
+    except ImportError:
+        from langchain_community.embeddings import HuggingFaceEmbeddings
+
+    print(f"Loading embedding model: {Config.FREE_EMBEDDING_MODEL}")
+    embeddings = HuggingFaceEmbeddings(
+        model_name=Config.FREE_EMBEDDING_MODEL,
+        model_kwargs={'device': 'cpu'}
+    )
+
+    if dry_run:
+        # Only the cache is needed; skip FAISS and the LLM client
+        from semantic_cache import SemanticCache
+        cache = SemanticCache(category)
+    else:
+        from chatbot import RAGChatbot
+        # Warm-up traffic must not feed back into the query log it replays
+        chatbot = RAGChatbot(category, embeddings=embeddings, log_queries=False)
+        cache = chatbot.cache
+
+    vectors = embed_queries(ranked, embeddings)
+    clusters = cluster_queries(ranked, vectors)
+    print(f"Grouped into {len(clusters)} clusters.")
+
+    # Only warm clusters whose leader is not already answered by the cache
+    pending = []
+    for cluster in clusters:
+        _, similarity = cache.best_match(cluster["embedding"])
+        if similarity < Config.CACHE_SIMILARITY_THRESHOLD:
+            pending.append(cluster)
+        if len(pending) >= top_n:
+            break
+
+    for cluster in pending:
+        print(f"  [{cluster['count']:>4}x] {cluster['query']}")
+
+    if dry_run:
+        before, after = estimate_hit_rate(ranked, vectors, cache, pending)
+        print(f"Dry run: {len(pending)} clusters would be sent to the LLM.")
+        print(f"Estimated cache hit rate on logged traffic: {before:.1f}% -> {after:.1f}% (+{after - before:.1f}%)")
+        return
+
+    # Simple fixed-interval rate limit against the LLM; cache hits are free
+    min_interval = 60.0 / requests_per_minute if requests_per_minute > 0 else 0
+    last_call = 0.0
+    warmed = 0
+    for i, cluster in enumerate(pending, 1):
+        wait = min_interval - (time.time() - last_call)
+        if wait > 0:
+            time.sleep(wait)
+
+        last_call = time.time()
+        result = chatbot.query(cluster["query"])
+        if result["is_cached"]:
+            status = "cached"
+            last_call = 0.0
+        elif result["confidence"]:
+            status = "warmed"
+            warmed += 1
+        else:
+            status = "failed"
+        print(f"[{i}/{len(pending)}] {status} in {result['response_time']:.0f}ms: {cluster['query']}")
+
+    print(f"Cache warm-up finished. {warmed} new entries added to {cache.cache_file}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pre-warm the semantic cache from a recorded query log.")
+    parser.add_argument("--category", default="unified")
+    parser.add_argument("--log-file", default=None, help="JSONL query log (defaults to logs/<category>_queries.jsonl)")
+    parser.add_argument("--top-n", type=int, default=Config.WARMUP_TOP_N)
+    parser.add_argument("--rpm", type=float, default=Config.WARMUP_REQUESTS_PER_MINUTE, help="Max LLM requests per minute")
+    parser.add_argument("--dry-run", action="store_true", help="Estimate the hit-rate gain without calling the LLM")
+    parser.add_argument("--days", type=int, default=Config.QUERY_LOG_RETENTION_DAYS,
+                        help="Only replay queries from the last N days (0 for the whole log)")
+    args = parser.parse_args()
+
+    warm_cache(
+        category=args.category,
+        log_file=args.log_file,
+        top_n=args.top_n,
+        requests_per_minute=args.rpm,
+        dry_run=args.dry_run,
+        days=args.days
+    )